@@ -9,6 +9,8 @@ import tempfile
 from PIL import Image
 import base64
 import platform
+import time
+from preflight import analyze_repo, estimate_build, format_estimate, load_history, record_build
 
 # Set page configuration
 st.set_page_config(
@@ -382,6 +384,11 @@ def main():
                         progress_bar.progress(25)
                         st.success("✅ Repository cloned successfully.")
 
+                        # Pre-flight analysis so the user knows what to expect before the build starts.
+                        analysis = analyze_repo(clone_dir)
+                        estimate = estimate_build(analysis, load_history())
+                        st.info(f"⏱️ Estimated build: {format_estimate(estimate)}")
+
                         st.info("🔍 Searching for the main Streamlit script...")
                         streamlit_script = find_streamlit_script(clone_dir)
                         if not streamlit_script:
@@ -416,7 +423,9 @@ def main():
                                 return
 
                         st.info("⚙️ Building executable using PyInstaller (this may take a few minutes)...")
+                        build_start = time.monotonic()
                         build_executable(os.path.relpath(wrapper_file, clone_dir), exe_name_final, icon_file_path)
+                        build_duration = time.monotonic() - build_start
                         progress_bar.progress(90)
                         
                         # Determine the expected executable path.
@@ -425,6 +434,7 @@ def main():
                         if os.path.exists(executable_path):
                             with open(executable_path, "rb") as exe_file:
                                 st.session_state.exe_data = exe_file.read()
+                            record_build(analysis, build_duration, os.path.getsize(executable_path), repo_name)
                             progress_bar.progress(100)
                             st.success("✅ Executable created successfully!")
                         else:
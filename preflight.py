@@ -0,0 +1,183 @@
+import os
+import re
+import json
+import math
+import statistics
+import tempfile
+
+# Where past build metrics are kept. Stored in the home folder because builds run inside clones that get deleted.
+HISTORY_FILE = os.path.join(os.path.expanduser('~'), '.packnplay_history.json')
+MAX_HISTORY = 200
+
+# Baseline for a PyInstaller one-file build of a Streamlit app with no other heavy dependencies.
+BASE_SECONDS = 60
+BASE_BYTES = 60 * 1024 * 1024
+
+# Rough extra build time (seconds) and artifact size (MB) added by well-known heavy packages.
+HEAVY_PACKAGES = {
+    'torch': (180, 700),
+    'tensorflow': (180, 600),
+    'transformers': (60, 150),
+    'opencv-python': (30, 90),
+    'scipy': (30, 80),
+    'pyarrow': (20, 80),
+    'scikit-learn': (30, 50),
+    'pandas': (20, 40),
+    'matplotlib': (20, 40),
+    'plotly': (15, 40),
+    'numpy': (10, 30),
+    'altair': (5, 10),
+}
+
+# Folders PyInstaller writes into the repository; reused clones may still contain them.
+BUILD_OUTPUT_DIRS = {'build', 'dist'}
+
+DEPENDENCY_FILES = ['requirements.txt', 'pyproject.toml', 'setup.py', 'setup.cfg', 'Pipfile', 'environment.yml']
+
+def find_heavy_dependencies(repo_dir):
+    """
+    Returns the sorted list of heavy packages declared in the repository's dependency files.
+    """
+    declared = set()
+    for filename in DEPENDENCY_FILES:
+        filepath = os.path.join(repo_dir, filename)
+        if not os.path.isfile(filepath):
+            continue
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read().lower().replace('_', '-')
+        except Exception as e:
+            print(f"Could not read {filepath}: {e}")
+            continue
+        for package in HEAVY_PACKAGES:
+            if re.search(rf'(?<![\w-]){re.escape(package)}(?![\w-])', content):
+                declared.add(package)
+    return sorted(declared)
+
+def analyze_repo(repo_dir):
+    """
+    Fast pre-flight pass over a cloned repository.
+    Measures what PyInstaller will bundle (the whole folder) and which heavy dependencies are declared.
+    Output left by earlier PyInstaller runs ('build' and 'dist') is not counted.
+    """
+    total_bytes = 0
+    file_count = 0
+    py_file_count = 0
+    for root, dirs, files in os.walk(repo_dir):
+        if os.path.samefile(root, repo_dir):
+            dirs[:] = [d for d in dirs if d not in BUILD_OUTPUT_DIRS]
+        for file in files:
+            try:
+                total_bytes += os.path.getsize(os.path.join(root, file))
+            except OSError:
+                continue
+            file_count += 1
+            if file.endswith('.py'):
+                py_file_count += 1
+    return {
+        'total_bytes': total_bytes,
+        'file_count': file_count,
+        'py_file_count': py_file_count,
+        'heavy_deps': find_heavy_dependencies(repo_dir),
+    }
+
+def heuristic_estimate(analysis):
+    """Predicts (seconds, bytes) from the repository analysis alone."""
+    seconds = BASE_SECONDS + analysis['file_count'] * 0.01 + analysis['total_bytes'] / (50 * 1024 * 1024)
+    size = BASE_BYTES + analysis['total_bytes']
+    for package in analysis['heavy_deps']:
+        # Older history may list packages that have since been dropped from the table.
+        extra_seconds, extra_mb = HEAVY_PACKAGES.get(package, (0, 0))
+        seconds += extra_seconds
+        size += extra_mb * 1024 * 1024
+    return seconds, size
+
+def load_history(history_file=HISTORY_FILE):
+    """Loads past build metrics, returning an empty list if there are none yet."""
+    if not os.path.exists(history_file):
+        return []
+    try:
+        with open(history_file, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read build history {history_file}: {e}")
+        return []
+    if not isinstance(history, list):
+        print(f"Ignoring build history {history_file}: expected a list of builds.")
+        return []
+    return history
+
+def record_build(analysis, duration, artifact_bytes, repo_name=None, history_file=HISTORY_FILE):
+    """
+    Appends the metrics of a finished build to the local history.
+    Recording is best-effort: a failure is logged and never fails the build itself.
+    """
+    history = load_history(history_file)
+    history.append(dict(analysis, repo_name=repo_name, duration=duration, artifact_bytes=artifact_bytes))
+    temp_path = None
+    try:
+        # Write a temporary file next to the history and swap it in, so a crash or a concurrent
+        # writer never leaves a half-written history behind.
+        fd, temp_path = tempfile.mkstemp(prefix='.packnplay_history.', suffix='.tmp',
+                                         dir=os.path.dirname(os.path.abspath(history_file)))
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(history[-MAX_HISTORY:], f, indent=2)
+        os.replace(temp_path, history_file)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Could not record build metrics in {history_file}: {e}")
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def _is_valid_record(record):
+    """Checks that a history entry has every metric the estimator reads, with usable values."""
+    if not isinstance(record, dict):
+        return False
+    for key in ('total_bytes', 'file_count', 'duration', 'artifact_bytes'):
+        value = record.get(key)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            return False
+    heavy_deps = record.get('heavy_deps')
+    return isinstance(heavy_deps, list) and all(isinstance(p, str) for p in heavy_deps)
+
+def _distance(analysis, record):
+    """How different a past build is from the one being estimated (0 means identical features)."""
+    deps, past_deps = set(analysis['heavy_deps']), set(record['heavy_deps'])
+    union = deps | past_deps
+    dep_gap = 1 - len(deps & past_deps) / len(union) if union else 0
+    size_gap = abs(math.log1p(analysis['total_bytes']) - math.log1p(record['total_bytes']))
+    return dep_gap + size_gap
+
+def estimate_build(analysis, history=None, neighbours=5):
+    """
+    Predicts build duration and artifact size for an analysed repository.
+
+    Starts from the heuristic estimate and scales it by how far off the heuristic
+    was for the most similar past builds on this machine.
+    Malformed history entries are skipped, since an estimate must never block a build.
+    """
+    seconds, size = heuristic_estimate(analysis)
+    usable = [record for record in history or [] if _is_valid_record(record)]
+    similar = sorted(usable, key=lambda record: _distance(analysis, record))[:neighbours]
+    if similar:
+        seconds *= statistics.median(r['duration'] / heuristic_estimate(r)[0] for r in similar)
+        size *= statistics.median(r['artifact_bytes'] / heuristic_estimate(r)[1] for r in similar)
+    return {'duration': seconds, 'artifact_bytes': size, 'based_on': len(similar)}
+
+def format_estimate(estimate):
+    """Formats an estimate for display, e.g. '~3 min, ~150 MB (based on 4 past builds)'."""
+    minutes = estimate['duration'] / 60
+    duration = f"~{minutes:.0f} min" if minutes >= 1 else f"~{estimate['duration']:.0f} s"
+    size = f"~{estimate['artifact_bytes'] / (1024 * 1024):.0f} MB"
+    if estimate['based_on']:
+        source = f"based on {estimate['based_on']} past build{'s' if estimate['based_on'] != 1 else ''}"
+    else:
+        source = "no build history yet"
+    return f"{duration}, {size} ({source})"
+
+def dist_size(repo_dir):
+    """Total size in bytes of the files PyInstaller wrote to the repository's 'dist' folder."""
+    dist_dir = os.path.join(repo_dir, 'dist')
+    if not os.path.isdir(dist_dir):
+        return 0
+    return sum(os.path.getsize(os.path.join(dist_dir, f)) for f in os.listdir(dist_dir)
+               if os.path.isfile(os.path.join(dist_dir, f)))
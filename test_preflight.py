@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from preflight import (analyze_repo, dist_size, estimate_build, find_heavy_dependencies, format_estimate,
+                       heuristic_estimate, load_history, record_build, BASE_BYTES, BASE_SECONDS)
+
+MB = 1024 * 1024
+
+def analysis(total_bytes=1000, file_count=10, heavy_deps=()):
+    return {'total_bytes': total_bytes, 'file_count': file_count, 'py_file_count': 1, 'heavy_deps': list(heavy_deps)}
+
+def test_heavy_dependencies_are_normalised(tmp_path):
+    (tmp_path / 'requirements.txt').write_text("scikit_learn>=1.0\nnumpy-financial\nstreamlit\n")
+    assert find_heavy_dependencies(tmp_path) == ['scikit-learn']
+
+def test_heavy_dependencies_from_pyproject(tmp_path):
+    (tmp_path / 'pyproject.toml').write_text('[project]\ndependencies = ["torch>=2", "pandas"]\n')
+    assert find_heavy_dependencies(tmp_path) == ['pandas', 'torch']
+
+def test_analyze_repo_skips_build_output(tmp_path):
+    (tmp_path / 'app.py').write_text("import streamlit\n")
+    for folder in ('dist', 'build'):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / 'old.exe').write_bytes(b'x' * 500)
+    result = analyze_repo(tmp_path)
+    assert result['file_count'] == 1
+    assert result['py_file_count'] == 1
+    assert result['total_bytes'] == len("import streamlit\n")
+
+def test_estimate_without_history_uses_heuristic():
+    repo = analysis(heavy_deps=['torch'])
+    estimate = estimate_build(repo, [])
+    assert estimate['based_on'] == 0
+    assert (estimate['duration'], estimate['artifact_bytes']) == heuristic_estimate(repo)
+    assert estimate['duration'] > BASE_SECONDS
+    assert estimate['artifact_bytes'] > BASE_BYTES + 700 * MB - 1
+    assert format_estimate(estimate).endswith("(no build history yet)")
+
+def test_history_scales_estimate():
+    repo = analysis()
+    seconds, size = heuristic_estimate(repo)
+    past = dict(analysis(), duration=seconds * 2, artifact_bytes=size / 2)
+    estimate = estimate_build(repo, [past])
+    assert estimate['based_on'] == 1
+    assert estimate['duration'] == pytest.approx(seconds * 2)
+    assert estimate['artifact_bytes'] == pytest.approx(size / 2)
+    assert format_estimate(estimate).endswith("(based on 1 past build)")
+
+def test_most_similar_builds_win():
+    repo = analysis(heavy_deps=['torch'])
+    seconds, _ = heuristic_estimate(repo)
+    similar = dict(analysis(heavy_deps=['torch']), duration=seconds * 3, artifact_bytes=BASE_BYTES)
+    different = dict(analysis(total_bytes=500 * MB, heavy_deps=['pandas']), duration=1, artifact_bytes=BASE_BYTES)
+    estimate = estimate_build(repo, [different, similar, similar], neighbours=2)
+    assert estimate['duration'] == pytest.approx(seconds * 3)
+    assert format_estimate(estimate).endswith("(based on 2 past builds)")
+
+def test_format_estimate_units():
+    assert format_estimate({'duration': 45, 'artifact_bytes': 150 * MB, 'based_on': 0}).startswith("~45 s, ~150 MB")
+    assert format_estimate({'duration': 180, 'artifact_bytes': 150 * MB, 'based_on': 0}).startswith("~3 min, ~150 MB")
+
+def test_record_and_load_history(tmp_path):
+    history_file = tmp_path / 'history.json'
+    record_build(analysis(), 42, 10 * MB, 'repo', history_file=str(history_file))
+    history = load_history(str(history_file))
+    assert len(history) == 1
+    assert history[0]['duration'] == 42 and history[0]['repo_name'] == 'repo'
+
+def test_history_that_is_not_a_list_is_ignored(tmp_path):
+    history_file = tmp_path / 'history.json'
+    history_file.write_text(json.dumps({'duration': 1}))
+    assert load_history(str(history_file)) == []
+
+def test_record_build_failure_is_not_raised(tmp_path):
+    record_build(analysis(), 1, 1, history_file=str(tmp_path / 'missing' / 'history.json'))
+
+def test_dist_size(tmp_path):
+    assert dist_size(tmp_path) == 0
+    (tmp_path / 'dist').mkdir()
+    (tmp_path / 'dist' / 'app.exe').write_bytes(b'x' * 300)
+    (tmp_path / 'dist' / 'app.pkg').write_bytes(b'x' * 200)
+    assert dist_size(tmp_path) == 500
+
+def test_malformed_history_is_skipped():
+    repo = analysis()
+    seconds, size = heuristic_estimate(repo)
+    good = dict(analysis(), duration=seconds * 2, artifact_bytes=size)
+    history = [
+        'not a build',
+        None,
+        {'duration': 10, 'artifact_bytes': 10, 'total_bytes': 10, 'file_count': 1},
+        dict(analysis(), duration='slow', artifact_bytes=size),
+        dict(analysis(), duration=None, artifact_bytes=size),
+        good,
+    ]
+    estimate = estimate_build(repo, history)
+    assert estimate['based_on'] == 1
+    assert estimate['duration'] == pytest.approx(seconds * 2)
+
+def test_unknown_heavy_package_in_history_is_ignored():
+    repo = analysis()
+    seconds, size = heuristic_estimate(repo)
+    past = dict(analysis(heavy_deps=['jax']), duration=seconds, artifact_bytes=size)
+    assert heuristic_estimate(past) == (seconds, size)
+    assert estimate_build(repo, [past])['based_on'] == 1
+
+def test_record_build_replaces_history_atomically(tmp_path):
+    history_file = tmp_path / 'history.json'
+    record_build(analysis(), 1, 1, history_file=str(history_file))
+    record_build(analysis(), 2, 2, history_file=str(history_file))
+    assert [r['duration'] for r in load_history(str(history_file))] == [1, 2]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['history.json']
+
+def test_record_build_failure_keeps_existing_history(tmp_path):
+    history_file = tmp_path / 'history.json'
+    record_build(analysis(), 1, 1, history_file=str(history_file))
+    record_build(analysis(), float('nan'), object(), history_file=str(history_file))
+    assert [r['duration'] for r in load_history(str(history_file))] == [1]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['history.json']
@@ -0,0 +1,194 @@
+import os
+import subprocess
+
+import pytest
+
+import watch
+from watch import RepoWatcher, ls_remote, resolve_ref
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME='test', GIT_AUTHOR_EMAIL='test@example.com',
+               GIT_COMMITTER_NAME='test', GIT_COMMITTER_EMAIL='test@example.com')
+
+def git(repo_dir, *args):
+    return subprocess.run(['git', '-C', str(repo_dir), *args], check=True, env=GIT_ENV,
+                          stdout=subprocess.PIPE, text=True).stdout.strip()
+
+def commit(repo_dir):
+    git(repo_dir, 'commit', '--quiet', '--allow-empty', '-m', 'change')
+    return git(repo_dir, 'rev-parse', 'HEAD')
+
+@pytest.fixture
+def repo(tmp_path):
+    repo_dir = tmp_path / 'repo'
+    subprocess.run(['git', 'init', '--quiet', '-b', 'main', str(repo_dir)], check=True)
+    commit(repo_dir)
+    return repo_dir
+
+def make_watcher(targets, **kwargs):
+    builds = []
+    watcher = RepoWatcher(targets, lambda *build: builds.append(build), **kwargs)
+    return watcher, builds
+
+def test_first_poll_only_records_baseline(repo):
+    watcher, builds = make_watcher([(repo.as_uri(), 'main')], debounce=0)
+    assert watcher.run_once(now=0) == []
+    assert builds == []
+    assert watcher.built[(repo.as_uri(), 'main')] == git(repo, 'rev-parse', 'HEAD')
+
+def test_burst_of_commits_builds_latest_once(repo):
+    url = repo.as_uri()
+    watcher, builds = make_watcher([(url, 'main')], debounce=10)
+    watcher.run_once(now=0)
+
+    commit(repo)
+    assert watcher.run_once(now=1) == []
+    latest = commit(repo)
+    assert watcher.run_once(now=5) == []
+    # The second commit restarted the quiet period, so nothing is due before t=15.
+    assert watcher.run_once(now=14) == []
+    assert watcher.run_once(now=15) == [(url, 'main', latest)]
+    assert builds == [(url, 'main', latest)]
+
+def test_unchanged_sha_never_rebuilds(repo):
+    url = repo.as_uri()
+    watcher, builds = make_watcher([(url, 'main')], debounce=0, build_initial=True)
+    for now in range(5):
+        watcher.run_once(now=now)
+    assert builds == [(url, 'main', git(repo, 'rev-parse', 'HEAD'))]
+
+def test_refs_on_same_commit_share_one_build(repo):
+    url = repo.as_uri()
+    watcher, builds = make_watcher([(url, 'main'), (url, 'HEAD')], debounce=0)
+    watcher.run_once(now=0)
+    latest = commit(repo)
+    watcher.run_once(now=1)
+    assert builds == [(url, 'main', latest)]
+    assert watcher.built == {(url, 'main'): latest, (url, 'HEAD'): latest}
+
+def test_annotated_tag_resolves_to_commit(repo):
+    url = repo.as_uri()
+    head = git(repo, 'rev-parse', 'HEAD')
+    git(repo, 'tag', '--annotate', 'v1', '-m', 'v1')
+    assert resolve_ref(ls_remote(url, ['v1']), 'v1') == head
+
+    watcher, builds = make_watcher([(url, 'v1')], debounce=0)
+    watcher.run_once(now=0)
+    # Re-creating the tag on the same commit gives a new tag object but must not rebuild.
+    git(repo, 'tag', '--force', '--annotate', 'v1', '-m', 'v1 again')
+    watcher.run_once(now=1)
+    assert builds == []
+    assert watcher.built[(url, 'v1')] == head
+
+def test_unreachable_repo_is_skipped(repo, tmp_path):
+    url = repo.as_uri()
+    missing = (tmp_path / 'missing').as_uri()
+    watcher, builds = make_watcher([(missing, 'main'), (url, 'main')], debounce=0)
+    watcher.run_once(now=0)
+    latest = commit(repo)
+    watcher.run_once(now=1)
+    assert builds == [(url, 'main', latest)]
+    assert (missing, 'main') not in watcher.built
+
+def test_failed_build_is_retried(repo):
+    url = repo.as_uri()
+    attempts = []
+
+    def flaky_build(*build):
+        attempts.append(build)
+        if len(attempts) == 1:
+            raise SystemExit(1)
+
+    watcher = RepoWatcher([(url, 'main')], flaky_build, debounce=10)
+    watcher.run_once(now=0)
+    latest = commit(repo)
+    watcher.run_once(now=1)
+    watcher.run_once(now=11)
+    assert watcher.built[(url, 'main')] != latest
+    # The retry waits for a fresh debounce period.
+    watcher.run_once(now=12)
+    watcher.run_once(now=22)
+    assert attempts == [(url, 'main', latest)] * 2
+    assert watcher.built[(url, 'main')] == latest
+    watcher.run_once(now=40)
+    assert len(attempts) == 2
+
+def test_superseded_commits_are_discarded(repo):
+    url = repo.as_uri()
+    discarded = []
+    watcher = RepoWatcher([(url, 'main'), (url, 'v1')], lambda *build: None, debounce=0,
+                          discard_fn=lambda *commit: discarded.append(commit))
+    first = git(repo, 'rev-parse', 'HEAD')
+    git(repo, 'tag', 'v1')
+    watcher.run_once(now=0)
+    second = commit(repo)
+    watcher.run_once(now=1)
+    # 'v1' still points at the first commit, so its checkout is kept.
+    assert discarded == []
+    git(repo, 'tag', '--force', 'v1')
+    watcher.run_once(now=2)
+    assert discarded == [(url, first)]
+    assert watcher.built == {(url, 'main'): second, (url, 'v1'): second}
+
+def test_hanging_remote_is_skipped(repo, monkeypatch):
+    url = repo.as_uri()
+    hanging = 'https://example.invalid/hangs.git'
+
+    def fake_ls_remote(repo_url, refs):
+        if repo_url == hanging:
+            raise subprocess.TimeoutExpired(['git', 'ls-remote', repo_url], 30)
+        return ls_remote(repo_url, refs)
+
+    monkeypatch.setattr(watch, 'ls_remote', fake_ls_remote)
+    watcher, builds = make_watcher([(hanging, 'main'), (url, 'main')], debounce=0)
+    watcher.run_once(now=0)
+    latest = commit(repo)
+    watcher.run_once(now=1)
+    assert builds == [(url, 'main', latest)]
+    assert (hanging, 'main') not in watcher.built
+
+def test_checkout_commit_clones_requested_sha(repo, tmp_path):
+    url = repo.as_uri()
+    first = git(repo, 'rev-parse', 'HEAD')
+    commit(repo)
+    work_dir = tmp_path / 'work'
+    work_dir.mkdir()
+
+    clone_dir = watch.checkout_commit(url, first, str(work_dir))
+    assert clone_dir == watch.checkout_dir(url, first, str(work_dir))
+    assert git(clone_dir, 'rev-parse', 'HEAD') == first
+    # An existing checkout is reused rather than cloned again.
+    assert watch.checkout_commit(url, first, str(work_dir)) == clone_dir
+
+    watch.remove_checkout(url, first, str(work_dir))
+    assert not os.path.exists(clone_dir)
+
+def test_build_commit_packages_checkout(repo, tmp_path, monkeypatch):
+    (repo / 'streamlit_app.py').write_text("import streamlit as st\n")
+    (repo / 'requirements.txt').write_text("streamlit\npandas\n")
+    git(repo, 'add', '.')
+    sha = commit(repo)
+    work_dir = tmp_path / 'work'
+    work_dir.mkdir()
+
+    built = []
+
+    def fake_build_executable(wrapper_file):
+        # Stands in for PyInstaller, which runs from inside the clone.
+        built.append((os.getcwd(), wrapper_file))
+        os.makedirs('dist')
+        with open(os.path.join('dist', 'run_streamlit_wrapper'), 'wb') as f:
+            f.write(b'x' * 100)
+
+    recorded = []
+    monkeypatch.setattr(watch, 'build_executable', fake_build_executable)
+    monkeypatch.setattr(watch, 'load_history', lambda: [])
+    monkeypatch.setattr(watch, 'record_build', lambda *args: recorded.append(args))
+
+    watch.build_commit(repo.as_uri(), 'main', sha, str(work_dir))
+    clone_dir = watch.checkout_dir(repo.as_uri(), sha, str(work_dir))
+    assert built == [(clone_dir, 'run_streamlit_wrapper.py')]
+    assert git(clone_dir, 'rev-parse', 'HEAD') == sha
+    analysis, _, artifact_bytes, repo_name = recorded[0]
+    assert analysis['heavy_deps'] == ['pandas']
+    assert artifact_bytes == 100
+    assert repo_name == 'repo'
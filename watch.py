@@ -0,0 +1,292 @@
+import os
+import sys
+import time
+import shutil
+import stat
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from preflight import analyze_repo, estimate_build, format_estimate, load_history, record_build, dist_size
+
+from packaging_utils import extract_repo_name, clone_repo, find_streamlit_script, create_wrapper_file, build_executable
+
+# Seconds to wait for a remote to answer a poll before skipping it.
+LS_REMOTE_TIMEOUT = 30
+
+def parse_watch_spec(spec):
+    """
+    Splits a watch spec of the form 'URL#REF' into (url, ref).
+    The ref defaults to HEAD when no '#REF' suffix is given.
+    """
+    repo_url, _, ref = spec.partition('#')
+    return repo_url.strip(), (ref.strip() or 'HEAD')
+
+def ls_remote(repo_url, refs, timeout=LS_REMOTE_TIMEOUT):
+    """
+    Runs a single 'git ls-remote' against the repository for all requested refs.
+    Returns a dict mapping each advertised ref name to its SHA.
+    """
+    # Refs are passed as patterns so the remote only advertises what is being watched.
+    # Patterns never match peeled '^{}' lines, so those are requested explicitly for annotated tags.
+    patterns = []
+    for ref in dict.fromkeys(refs):
+        patterns.extend([ref, f'{ref}^{{}}'])
+    command = ['git', 'ls-remote', repo_url] + patterns
+    # Never wait for credentials: a prompt would block the polling thread forever.
+    env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                            env=env, timeout=timeout).stdout
+    advertised = {}
+    for line in output.splitlines():
+        sha, _, name = line.partition('\t')
+        if name:
+            advertised[name] = sha
+    return advertised
+
+def resolve_ref(advertised, ref):
+    """
+    Picks the commit SHA for a ref out of 'git ls-remote' output.
+    Accepts full ref names, branch names and tag names (annotated tags are peeled to their commit).
+    """
+    for name in (ref, f'refs/heads/{ref}', f'refs/tags/{ref}'):
+        if f'{name}^{{}}' in advertised:
+            return advertised[f'{name}^{{}}']
+        if name in advertised:
+            return advertised[name]
+    return None
+
+def checkout_dir(repo_url, sha, work_dir):
+    """Returns the per-commit folder under work_dir used to clone and build one SHA."""
+    return os.path.join(work_dir, f"{extract_repo_name(repo_url)}-{sha[:12]}")
+
+def checkout_commit(repo_url, sha, work_dir):
+    """
+    Clones the repository into a per-commit folder under work_dir and checks out the given SHA.
+    """
+    clone_dir = checkout_dir(repo_url, sha, work_dir)
+    if not os.path.exists(clone_dir):
+        clone_repo(repo_url, clone_dir)
+    subprocess.check_call(['git', '-C', clone_dir, 'checkout', '--quiet', '--detach', sha])
+    return clone_dir
+
+def remove_checkout(repo_url, sha, work_dir):
+    """
+    Deletes the per-commit folder of a superseded build, including its PyInstaller output.
+    """
+    clone_dir = checkout_dir(repo_url, sha, work_dir)
+
+    def on_rm_error(func, path, exc_info):
+        # Git marks some object files read-only, which blocks deletion on Windows.
+        os.chmod(path, stat.S_IWRITE)
+        func(path)
+
+    if os.path.isdir(clone_dir):
+        try:
+            shutil.rmtree(clone_dir, onerror=on_rm_error)
+            print(f"Removed previous build folder '{clone_dir}'.")
+        except OSError as e:
+            print(f"Could not remove '{clone_dir}': {e}")
+
+def build_checkout(clone_dir):
+    """
+    Runs the Streamlit packaging steps on an already cloned repository.
+    """
+    streamlit_script = find_streamlit_script(clone_dir)
+    if not streamlit_script:
+        raise Exception(f"Could not locate a Streamlit script in '{clone_dir}'.")
+
+    # PyInstaller bundles the current folder, so build from inside the clone and restore afterwards.
+    original_dir = os.getcwd()
+    os.chdir(clone_dir)
+    try:
+        wrapper_file = create_wrapper_file(streamlit_script)
+        build_executable(os.path.relpath(wrapper_file, clone_dir))
+    finally:
+        os.chdir(original_dir)
+    print(f"Executable created in the 'dist' folder within '{clone_dir}'.")
+
+def estimate_commit(repo_url, ref, sha, work_dir):
+    """
+    Clones one commit of a watched repository and returns its predicted build duration in seconds.
+    Used to order builds; build_commit shows the full estimate when the build starts.
+    """
+    clone_dir = checkout_commit(repo_url, sha, work_dir)
+    return estimate_build(analyze_repo(clone_dir), load_history())['duration']
+
+def build_commit(repo_url, ref, sha, work_dir):
+    """Clones and packages one commit of a watched repository, recording its build metrics."""
+    print(f"Building {repo_url} ({ref}) at {sha[:12]}...")
+    clone_dir = checkout_commit(repo_url, sha, work_dir)
+    analysis = analyze_repo(clone_dir)
+    print(f"Estimated build: {format_estimate(estimate_build(analysis, load_history()))}")
+    build_start = time.monotonic()
+    build_checkout(clone_dir)
+    record_build(analysis, time.monotonic() - build_start, dist_size(clone_dir), extract_repo_name(repo_url))
+
+class RepoWatcher:
+    """
+    Polls a list of (repo_url, ref) targets and rebuilds them when their commit changes.
+
+    Each poll issues one 'git ls-remote' per distinct repository, run in parallel.
+    A new SHA must stay unchanged for 'debounce' seconds before it is built, so a burst
+    of pushes collapses into a single build of the latest commit.
+    When an 'estimate_fn' is given, builds that become due together run shortest first.
+    When a 'discard_fn' is given, it is called with (repo_url, sha) for a commit once a newer
+    build has replaced it for every target, so old checkouts can be deleted.
+    """
+
+    def __init__(self, targets, build_fn, debounce=30.0, build_initial=False, max_workers=8, estimate_fn=None,
+                 discard_fn=None):
+        self.targets = list(dict.fromkeys(targets))
+        self.build_fn = build_fn
+        self.estimate_fn = estimate_fn
+        self.discard_fn = discard_fn
+        self.debounce = debounce
+        self.max_workers = max_workers
+        self.built = {}
+        self.pending = {}
+        self.seen = set()
+        self.build_initial = build_initial
+
+    def fetch_shas(self):
+        """Resolves the current SHA of every target, batching refs per repository."""
+        refs_by_repo = {}
+        for repo_url, ref in self.targets:
+            refs_by_repo.setdefault(repo_url, []).append(ref)
+
+        def query(repo_url):
+            try:
+                return repo_url, ls_remote(repo_url, refs_by_repo[repo_url])
+            except subprocess.CalledProcessError as e:
+                print(f"Could not poll {repo_url}: {e.stderr.strip() if e.stderr else e}")
+                return repo_url, None
+            except subprocess.TimeoutExpired:
+                print(f"Could not poll {repo_url}: no answer within {LS_REMOTE_TIMEOUT}s.")
+                return repo_url, None
+
+        workers = max(1, min(self.max_workers, len(refs_by_repo)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            advertised_by_repo = dict(executor.map(query, refs_by_repo))
+
+        shas = {}
+        for target in self.targets:
+            advertised = advertised_by_repo[target[0]]
+            if advertised is not None:
+                shas[target] = resolve_ref(advertised, target[1])
+        return shas
+
+    def poll(self, now=None):
+        """
+        Polls all targets once and returns the (repo_url, ref, sha) builds that are due.
+        """
+        now = time.monotonic() if now is None else now
+        due = []
+        for target, sha in self.fetch_shas().items():
+            if sha is None:
+                print(f"Ref '{target[1]}' not found in {target[0]}.")
+                continue
+            if target not in self.seen:
+                self.seen.add(target)
+                if not self.build_initial:
+                    # The first observation is the baseline; only later changes trigger builds.
+                    self.built[target] = sha
+            if sha == self.built.get(target):
+                self.pending.pop(target, None)
+                continue
+            pending = self.pending.get(target)
+            if pending is None or pending[0] != sha:
+                # A new commit restarts the quiet period.
+                self.pending[target] = (sha, now)
+                pending = self.pending[target]
+            if now - pending[1] >= self.debounce:
+                del self.pending[target]
+                due.append((target[0], target[1], sha))
+        return due
+
+    def schedule(self, due):
+        """Orders due builds by predicted duration, shortest first."""
+        if self.estimate_fn is None or len(due) < 2:
+            return list(due)
+
+        def predicted(build):
+            try:
+                return self.estimate_fn(*build)
+            except (Exception, SystemExit) as e:
+                print(f"Could not estimate {build[0]} ({build[1]}): {e}")
+                return float('inf')
+
+        return sorted(due, key=predicted)
+
+    def run_builds(self, due):
+        """
+        Builds each due commit, remembering it so the same SHA is never built twice.
+        Refs of one repository that resolve to the same commit share a single build.
+        A failed build is not remembered, so it is retried once the debounce period passes again.
+        Returns the builds that were run.
+        """
+        refs_by_commit = {}
+        for repo_url, ref, sha in due:
+            refs_by_commit.setdefault((repo_url, sha), []).append(ref)
+
+        builds = self.schedule([(repo_url, refs[0], sha) for (repo_url, sha), refs in refs_by_commit.items()])
+        for repo_url, ref, sha in builds:
+            try:
+                self.build_fn(repo_url, ref, sha)
+            except (Exception, SystemExit) as e:
+                # Packaging helpers exit on failure; keep watching the other repositories.
+                print(f"Build of {repo_url} ({ref}) at {sha[:12]} failed, will retry: {e}")
+                continue
+            replaced = set()
+            for built_ref in refs_by_commit[(repo_url, sha)]:
+                replaced.add(self.built.get((repo_url, built_ref)))
+                self.built[(repo_url, built_ref)] = sha
+            self.discard(repo_url, replaced - {None, sha})
+        return builds
+
+    def discard(self, repo_url, shas):
+        """Hands superseded commits to discard_fn unless another target still uses them."""
+        if self.discard_fn is None:
+            return
+        in_use = {sha for (url, _), sha in self.built.items() if url == repo_url}
+        for sha in shas - in_use:
+            self.discard_fn(repo_url, sha)
+
+    def run_once(self, now=None):
+        """Polls once and runs any builds that became due."""
+        return self.run_builds(self.poll(now))
+
+    def watch(self, interval=60.0):
+        """Polls forever, sleeping 'interval' seconds between polls."""
+        while True:
+            self.run_once()
+            time.sleep(interval)
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch repositories and rebuild executables when they change.")
+    parser.add_argument('repos', nargs='+', help="Repositories to watch as URL or URL#REF (default ref: HEAD).")
+    parser.add_argument('--interval', type=float, default=60.0, help="Seconds between polls.")
+    parser.add_argument('--debounce', type=float, default=30.0, help="Seconds a new commit must stay unchanged before it is built.")
+    parser.add_argument('--work-dir', default=os.getcwd(), help="Folder where commits are cloned and built.")
+    parser.add_argument('--build-initial', action='store_true', help="Also build the commits found on the first poll.")
+    args = parser.parse_args()
+
+    work_dir = os.path.abspath(args.work_dir)
+    targets = [parse_watch_spec(spec) for spec in args.repos]
+    watcher = RepoWatcher(
+        targets,
+        lambda repo_url, ref, sha: build_commit(repo_url, ref, sha, work_dir),
+        debounce=args.debounce,
+        build_initial=args.build_initial,
+        estimate_fn=lambda repo_url, ref, sha: estimate_commit(repo_url, ref, sha, work_dir),
+        discard_fn=lambda repo_url, sha: remove_checkout(repo_url, sha, work_dir),
+    )
+    print(f"Watching {len(targets)} ref(s), polling every {args.interval:g}s...")
+    try:
+        watcher.watch(args.interval)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+        sys.exit(0)
+
+if __name__ == '__main__':
+    main()